@@ -1,406 +1,506 @@
-"""
-Module managing an ant colony in a labyrinth
-"""
-import numpy as np
-import maze
-import pheromone
-import direction as d
-import pygame as pg
-from mpi4py import MPI
-
-comm = MPI.COMM_WORLD.Dup()
-rank = comm.Get_rank()  # Get the rank of the current process
-nbp = comm.Get_size()   # Get the total number of processes
-
-UNLOADED, LOADED = False, True
-
-exploration_coefs = 0.
-
-
-class Colony:
-    """
-    Represent an ant colony. Ants are not individualized for performance reasons!
-
-    Inputs :
-        nb_ants  : Number of ants in the anthill
-        pos_init : Initial positions of ants (anthill position)
-        max_life : Maximum life that ants can reach
-    """
-    def __init__(self, nb_ants, pos_init, max_life):
-        # Each ant has is own unique random seed
-        self.seeds = np.arange(1, nb_ants+1, dtype=np.int64)
-        # State of each ant : loaded or unloaded
-        self.is_loaded = np.zeros(nb_ants, dtype=np.int8)
-        # Compute the maximal life amount for each ant :
-        #   Updating the random seed :
-        self.seeds[:] = np.mod(16807*self.seeds[:], 2147483647)
-        # Amount of life for each ant = 75% à 100% of maximal ants life
-        self.max_life = max_life * np.ones(nb_ants, dtype=np.int32)
-        self.max_life -= np.int32(max_life*(self.seeds/2147483647.))//4
-        # Ages of ants : zero at beginning
-        self.age = np.zeros(nb_ants, dtype=np.int64)
-        # History of the path taken by each ant. The position at the ant's age represents its current position.
-        self.historic_path = np.zeros((nb_ants, max_life+1, 2), dtype=np.int16)
-        self.historic_path[:, 0, 0] = pos_init[0]
-        self.historic_path[:, 0, 1] = pos_init[1]
-        # Direction in which the ant is currently facing (depends on the direction it came from).
-        self.directions = d.DIR_NONE*np.ones(nb_ants, dtype=np.int8)
-        
-        '''
-        self.sprites = []
-        img = pg.image.load("ants.png").convert_alpha()
-        for i in range(0, 32, 8):
-            self.sprites.append(pg.Surface.subsurface(img, i, 0, 8, 8))
-            '''
-
-
-    def return_to_nest(self, loaded_ants, pos_nest, food_counter):
-        """
-        Function that returns the ants carrying food to their nests.
-
-        Inputs :
-            loaded_ants: Indices of ants carrying food
-            pos_nest: Position of the nest where ants should go
-            food_counter: Current quantity of food in the nest
-
-        Returns the new quantity of food
-        """
-        self.age[loaded_ants] -= 1
-
-        in_nest_tmp = self.historic_path[loaded_ants, self.age[loaded_ants], :] == pos_nest
-        if in_nest_tmp.any():
-            in_nest_loc = np.nonzero(np.logical_and(in_nest_tmp[:, 0], in_nest_tmp[:, 1]))[0]
-            if in_nest_loc.shape[0] > 0:
-                in_nest = loaded_ants[in_nest_loc]
-                self.is_loaded[in_nest] = UNLOADED
-                self.age[in_nest] = 0
-                food_counter += in_nest_loc.shape[0]
-        return food_counter
-
-    def explore(self, unloaded_ants, the_maze, pos_food, pos_nest, pheromones):
-        """
-        Management of unloaded ants exploring the maze.
-
-        Inputs:
-            unloadedAnts: Indices of ants that are not loaded
-            maze        : The maze in which ants move
-            posFood     : Position of food in the maze
-            posNest     : Position of the ants' nest in the maze
-            pheromones  : The pheromone map (which also has ghost cells for
-                          easier edge management)
-
-        Outputs: None
-        """
-        # Update of the random seed (for manual pseudo-random) applied to all unloaded ants
-        self.seeds[unloaded_ants] = np.mod(16807*self.seeds[unloaded_ants], 2147483647)
-
-        # Calculating possible exits for each ant in the maze:
-        old_pos_ants = self.historic_path[range(0, self.seeds.shape[0]), self.age[:], :]
-        has_north_exit = np.bitwise_and(the_maze.maze[old_pos_ants[:, 0], old_pos_ants[:, 1]], maze.NORTH) > 0
-        has_east_exit = np.bitwise_and(the_maze.maze[old_pos_ants[:, 0], old_pos_ants[:, 1]], maze.EAST) > 0
-        has_south_exit = np.bitwise_and(the_maze.maze[old_pos_ants[:, 0], old_pos_ants[:, 1]], maze.SOUTH) > 0
-        has_west_exit = np.bitwise_and(the_maze.maze[old_pos_ants[:, 0], old_pos_ants[:, 1]], maze.WEST) > 0
-
-        # Reading neighboring pheromones:
-        north_pos = np.copy(old_pos_ants)
-        north_pos[:, 1] += 1
-        north_pheromone = pheromones.pheromon[north_pos[:, 0], north_pos[:, 1]]*has_north_exit
-
-        east_pos = np.copy(old_pos_ants)
-        east_pos[:, 0] += 1
-        east_pos[:, 1] += 2
-        east_pheromone = pheromones.pheromon[east_pos[:, 0], east_pos[:, 1]]*has_east_exit
-
-        south_pos = np.copy(old_pos_ants)
-        south_pos[:, 0] += 2
-        south_pos[:, 1] += 1
-        south_pheromone = pheromones.pheromon[south_pos[:, 0], south_pos[:, 1]]*has_south_exit
-
-        west_pos = np.copy(old_pos_ants)
-        west_pos[:, 0] += 1
-        west_pheromone = pheromones.pheromon[west_pos[:, 0], west_pos[:, 1]]*has_west_exit
-
-        max_pheromones = np.maximum(north_pheromone, east_pheromone)
-        max_pheromones = np.maximum(max_pheromones, south_pheromone)
-        max_pheromones = np.maximum(max_pheromones, west_pheromone)
-
-        # Calculating choices for all ants not carrying food (for others, we calculate but it doesn't matter)
-        choices = self.seeds[:] / 2147483647.
-
-        # Ants explore the maze by choice or if no pheromone can guide them:
-        ind_exploring_ants = np.nonzero(
-            np.logical_or(choices[unloaded_ants] <= exploration_coefs, max_pheromones[unloaded_ants] == 0.))[0]
-        if ind_exploring_ants.shape[0] > 0:
-            ind_exploring_ants = unloaded_ants[ind_exploring_ants]
-            valid_moves = np.zeros(choices.shape[0], np.int8)
-            nb_exits = has_north_exit * np.ones(has_north_exit.shape) + has_east_exit * np.ones(has_east_exit.shape) + \
-                has_south_exit * np.ones(has_south_exit.shape) + has_west_exit * np.ones(has_west_exit.shape)
-            while np.any(valid_moves[ind_exploring_ants] == 0):
-                # Calculating indices of ants whose last move was not valid:
-                ind_ants_to_move = ind_exploring_ants[valid_moves[ind_exploring_ants] == 0]
-                self.seeds[:] = np.mod(16807*self.seeds[:], 2147483647)
-                # Choosing a random direction:
-                dir = np.mod(self.seeds[ind_ants_to_move], 4)
-                old_pos = self.historic_path[ind_ants_to_move, self.age[ind_ants_to_move], :]
-                new_pos = np.copy(old_pos)
-                new_pos[:, 1] -= np.logical_and(dir == d.DIR_WEST,
-                                                has_west_exit[ind_ants_to_move]) * np.ones(new_pos.shape[0], dtype=np.int16)
-                new_pos[:, 1] += np.logical_and(dir == d.DIR_EAST,
-                                                has_east_exit[ind_ants_to_move]) * np.ones(new_pos.shape[0], dtype=np.int16)
-                new_pos[:, 0] -= np.logical_and(dir == d.DIR_NORTH,
-                                                has_north_exit[ind_ants_to_move]) * np.ones(new_pos.shape[0], dtype=np.int16)
-                new_pos[:, 0] += np.logical_and(dir == d.DIR_SOUTH,
-                                                has_south_exit[ind_ants_to_move]) * np.ones(new_pos.shape[0], dtype=np.int16)
-                # Valid move if we didn't stay in place due to a wall
-                valid_moves[ind_ants_to_move] = np.logical_or(new_pos[:, 0] != old_pos[:, 0], new_pos[:, 1] != old_pos[:, 1])
-                # and if we're not in the opposite direction of the previous move (and if there are other exits)
-                valid_moves[ind_ants_to_move] = np.logical_and(
-                    valid_moves[ind_ants_to_move],
-                    np.logical_or(dir != 3-self.directions[ind_ants_to_move], nb_exits[ind_ants_to_move] == 1))
-                # Calculating indices of ants whose move we just validated:
-                ind_valid_moves = ind_ants_to_move[np.nonzero(valid_moves[ind_ants_to_move])[0]]
-                # For these ants, we update their positions and directions
-                self.historic_path[ind_valid_moves, self.age[ind_valid_moves] + 1, :] = new_pos[valid_moves[ind_ants_to_move] == 1, :]
-                self.directions[ind_valid_moves] = dir[valid_moves[ind_ants_to_move] == 1]
-
-        ind_following_ants = np.nonzero(np.logical_and(choices[unloaded_ants] > exploration_coefs,
-                                                       max_pheromones[unloaded_ants] > 0.))[0]
-        if ind_following_ants.shape[0] > 0:
-            ind_following_ants = unloaded_ants[ind_following_ants]
-            self.historic_path[ind_following_ants, self.age[ind_following_ants] + 1, :] = \
-                self.historic_path[ind_following_ants, self.age[ind_following_ants], :]
-            max_east = (east_pheromone[ind_following_ants] == max_pheromones[ind_following_ants])
-            self.historic_path[ind_following_ants, self.age[ind_following_ants]+1, 1] += \
-                max_east * np.ones(ind_following_ants.shape[0], dtype=np.int16)
-            max_west = (west_pheromone[ind_following_ants] == max_pheromones[ind_following_ants])
-            self.historic_path[ind_following_ants, self.age[ind_following_ants]+1, 1] -= \
-                max_west * np.ones(ind_following_ants.shape[0], dtype=np.int16)
-            max_north = (north_pheromone[ind_following_ants] == max_pheromones[ind_following_ants])
-            self.historic_path[ind_following_ants, self.age[ind_following_ants]+1, 0] -= max_north * np.ones(ind_following_ants.shape[0], dtype=np.int16)
-            max_south = (south_pheromone[ind_following_ants] == max_pheromones[ind_following_ants])
-            self.historic_path[ind_following_ants, self.age[ind_following_ants]+1, 0] += max_south * np.ones(ind_following_ants.shape[0], dtype=np.int16)
-
-        # Aging one unit for the age of ants not carrying food
-        if unloaded_ants.shape[0] > 0:
-            self.age[unloaded_ants] += 1
-
-        # Killing ants at the end of their life:
-        ind_dying_ants = np.nonzero(self.age == self.max_life)[0]
-        if ind_dying_ants.shape[0] > 0:
-            self.age[ind_dying_ants] = 0
-            self.historic_path[ind_dying_ants, 0, 0] = pos_nest[0]
-            self.historic_path[ind_dying_ants, 0, 1] = pos_nest[1]
-            self.directions[ind_dying_ants] = d.DIR_NONE
-
-        # For ants reaching food, we update their states:
-        ants_at_food_loc = np.nonzero(np.logical_and(self.historic_path[unloaded_ants, self.age[unloaded_ants], 0] == pos_food[0],
-                                                     self.historic_path[unloaded_ants, self.age[unloaded_ants], 1] == pos_food[1]))[0]
-        if ants_at_food_loc.shape[0] > 0:
-            ants_at_food = unloaded_ants[ants_at_food_loc]
-            self.is_loaded[ants_at_food] = True
-
-    def advance(self, the_maze, pos_food, pos_nest, pheromones, food_counter=0):
-        loaded_ants = np.nonzero(self.is_loaded == True)[0]
-        unloaded_ants = np.nonzero(self.is_loaded == False)[0]
-        if loaded_ants.shape[0] > 0:
-            food_counter = self.return_to_nest(loaded_ants, pos_nest, food_counter)
-        if unloaded_ants.shape[0] > 0:
-            self.explore(unloaded_ants, the_maze, pos_food, pos_nest, pheromones)
-
-        old_pos_ants = self.historic_path[range(0, self.seeds.shape[0]), self.age[:], :]
-        has_north_exit = np.bitwise_and(the_maze.maze[old_pos_ants[:, 0], old_pos_ants[:, 1]], maze.NORTH) > 0
-        has_east_exit = np.bitwise_and(the_maze.maze[old_pos_ants[:, 0], old_pos_ants[:, 1]], maze.EAST) > 0
-        has_south_exit = np.bitwise_and(the_maze.maze[old_pos_ants[:, 0], old_pos_ants[:, 1]], maze.SOUTH) > 0
-        has_west_exit = np.bitwise_and(the_maze.maze[old_pos_ants[:, 0], old_pos_ants[:, 1]], maze.WEST) > 0
-        # Marking pheromones:
-        [pheromones.mark(self.historic_path[i, self.age[i], :],
-                         [has_north_exit[i], has_east_exit[i], has_west_exit[i], has_south_exit[i]]) for i in range(self.directions.shape[0])]
-        
-        return food_counter
-        
-        # Method to return specific attributes of the Ants class
-    def returns(self):
-        return self.directions, self.historic_path, self.age
-
-# Class responsible for displaying ant sprites
-class Colony_show:
-    def __init__(self):
-        # Initialize a list to store ant sprites
-        self.sprites = []
-        # Load the ant sprites from the image file "ants.png"
-        img = pg.image.load("ants.png").convert_alpha()
-        # Extract individual sprites from the loaded image and store them in the list
-        for i in range(0, 32, 8):
-            self.sprites.append(pg.Surface.subsurface(img, i, 0, 8, 8))
-
-    # Method to display ant sprites on the screen
-    def display(self, screen, directions_recv, historic_path_recv, age_recv):
-        # Display each ant sprite based on its direction and position
-        [screen.blit(self.sprites[directions_recv[i]], (8*historic_path_recv[i, age_recv[i], 1], 8*historic_path_recv[i, age_recv[i], 0])) for i in range(directions_recv.shape[0])]
-
-if __name__ == "__main__":
-    import sys
-    import time
-
-    # Default maze size
-    size_laby = 25, 25
-
-    # Check for command line arguments to customize maze size
-    if len(sys.argv) > 2:
-        size_laby = int(sys.argv[1]), int(sys.argv[2])
-
-    # Calculate screen resolution based on maze size
-    resolution = size_laby[1] * 8, size_laby[0] * 8
-
-    # Initial positions and maximum life for ants
-    pos_food = size_laby[0] - 1, size_laby[1] - 1
-    pos_nest = 0, 0
-    max_life = 500
-
-    # Process with rank 0
-    if rank == 0:
-        # Initialize pygame and set screen resolution
-        pg.init()
-        screen = pg.display.set_mode(resolution)
-
-        # Check if command line arguments specify maximum ant life
-        if len(sys.argv) > 3:
-            max_life = int(sys.argv[3])
-
-        # Receive maze data from process rank 1
-        maze_recv = comm.recv(source=1, tag=8)
-        a_maze_show = maze.Maze_show(maze_recv)
-        mazeImg = a_maze_show.display()
-        snapshop_taken = False
-
-        # Receive ant directions, historic paths, and ages from process rank 1
-        directions_recv = comm.recv(source=1, tag=1)
-        historic_path_recv = comm.recv(source=1, tag=2)
-        age_recv = comm.recv(source=1, tag=3)
-
-        # Initialize Colony_show object for displaying ants
-        ants_show = Colony_show()
-        # Receive pheromone data from process rank 1
-        pherom_recv = comm.recv(source=1, tag=4)
-        pherom_show = pheromone.Pheromon_show(pherom_recv)
-        fps = []
-        counter = 0
-
-    # Processes with rank greater than 0
-    if rank > 0:
-        # Initialize food counter
-        food_counter = 0
-
-        # Create a maze with a specific seed for reproducibility
-        a_maze = maze.Maze(size_laby, 98726)
-
-        # Send maze data to process rank 0
-        maze_send = a_maze.retorno()
-        if rank == 1:
-            comm.send(maze_send, dest=0, tag=8)
-
-        # Set default alpha and beta values for pheromone calculation
-        alpha = 0.9
-        beta = 0.99
-
-        # Check for command line arguments specifying alpha and beta
-        if len(sys.argv) > 4:
-            alpha = float(sys.argv[4])
-        if len(sys.argv) > 5:
-            beta = float(sys.argv[5])
-
-        # Initialize Pheromon object for managing pheromones
-        pherom = pheromone.Pheromon(size_laby, pos_food, alpha, beta)
-        pheromon_send = pherom.pheromon
-
-        # Calculate the number of ants for each process (excluding process 0)
-        nb_ants = size_laby[0] * size_laby[1] // 4
-        nb_ants = round(nb_ants / (nbp - 1))
-
-        # Initialize ant colony for each process
-        ants = Colony(nb_ants, pos_nest, max_life)
-        unloaded_ants = np.array(range(nb_ants))
-
-        directions = ants.directions
-        historic_path = ants.historic_path
-        age = ants.age
-        
-        if rank == 1:
-            comm.send(directions, dest=0, tag=1)
-            comm.send(historic_path, dest=0, tag=2)
-            comm.send(age, dest=0, tag=3)
-            comm.send(pheromon_send, dest=0, tag=4)
-
-while True:
-    # If the process rank is greater than 0
-    if rank > 0:
-        # Advance ants in the maze and update food counter
-        food_counter = ants.advance(a_maze, pos_food, pos_nest, pherom, food_counter)
-        mise_a_jour = ants.returns()
-        pheromon_send = pherom.return_pheromon()
-
-        # Send pheromone data, ant updates, and food counter to process 0
-        send = (pheromon_send, mise_a_jour, food_counter)
-        comm.send([pheromon_send, mise_a_jour, food_counter], dest=0)
-        
-        # Perform pheromone evaporation around the food source
-        pherom.do_evaporation(pos_food)
-
-        # Receive updated pheromone data and food counter from process 0
-        pherom_returned, food_counter = comm.recv(source=0)
-        pherom.pheromon = pherom_returned
-
-    # If the process rank is 0
-    if rank == 0:
-        # Check for pygame events
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                pg.quit()
-                exit(0)
-
-        # Record current time and initialize pheromone matrix
-        deb = time.time()
-        pheromon = np.zeros((size_laby[0] + 2, size_laby[1] + 2), dtype=np.double)
-
-        # Initialize lists to store received ant data
-        directions_recv_list = []
-        historic_path_recv_list = []
-        age_recv_list = []
-        food_counter_total = 0
-
-        # Receive pheromone data, ant updates, and food counter from each process (excluding process 0)
-        for i in range(1, nbp):
-            pheromon_recv, primeiro, food_counter = comm.recv(source=i)
-            food_counter_total = food_counter + food_counter_total
-            for row in range(pheromon.shape[0]):
-                for col in range(pheromon.shape[1]):
-                    # Select the maximum between the local value and the received value
-                    pheromon[row, col] = max(pheromon[row, col], pheromon_recv[row, col])
-            directions_recv, historic_path_recv, age_recv = primeiro
-            directions_recv_list.append(directions_recv)
-            historic_path_recv_list.append(historic_path_recv)
-            age_recv_list.append(age_recv)
-
-        # Send back updated pheromone data and food counter to each process (excluding process 0)
-        devolver = pheromon_recv, food_counter
-        for i in range(1, nbp):
-            comm.send(devolver, dest=i)
-
-        # Display pheromone and ant data on the screen
-        pherom_show.display(screen, pheromon_recv)
-        screen.blit(mazeImg, (0, 0))
-        ants_show.display(screen, directions_recv, historic_path_recv, age_recv)  
-
-        # Update the display
-        pg.display.update()
-
-        # Record end time and save snapshot if food_counter is 1 and snapshot has not been taken
-        end = time.time()
-        if food_counter == 1 and not snapshop_taken:
-            pg.image.save(screen, "MyFirstFood.png")
-            snapshop_taken = True
-
-        # Calculate FPS and print statistics
-        fps.append(int(1./(end-deb)))
-        counter += 1
-        print(f"FPS : {1./(end-deb):6.2f}, nourriture : {food_counter:7d}, averege fps: {np.sum(fps)/counter}", end='\r')
+"""
+Module managing an ant colony in a labyrinth
+"""
+import os
+import numpy as np
+import maze
+import pheromone
+import direction as d
+from numba import njit, prange, set_num_threads
+
+UNLOADED, LOADED = False, True
+
+exploration_coefs = 0.
+
+# Maze exit bits and direction codes copied as module-level integers so that
+# Numba folds them as compile-time constants inside the kernel.
+NORTH, EAST, SOUTH, WEST = maze.NORTH, maze.EAST, maze.SOUTH, maze.WEST
+DIR_NONE, DIR_NORTH, DIR_EAST, DIR_WEST, DIR_SOUTH = \
+    d.DIR_NONE, d.DIR_NORTH, d.DIR_EAST, d.DIR_WEST, d.DIR_SOUTH
+
+# Lookup tables for sampling a direction among the open exits of a cell,
+# where exits are encoded as a 4-bit mask with bit i set when direction i
+# is open. _NTH_SET_BIT[mask, k] is the direction of the k-th set bit.
+_POPCOUNT = np.array([bin(m).count("1") for m in range(16)], dtype=np.int8)
+_NTH_SET_BIT = np.full((16, 4), DIR_NONE, dtype=np.int8)
+for _mask in range(16):
+    _k = 0
+    for _dir in range(4):
+        if _mask & (1 << _dir):
+            _NTH_SET_BIT[_mask, _k] = _dir
+            _k += 1
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _explore_kernel(choices, draws, age, path_row, path_col, cur_row, cur_col,
+                    directions, is_loaded, max_life, the_maze, pheromon,
+                    pos_food, pos_nest, exploration_coef):
+    """
+    Compiled per-ant update for the unloaded ants: neighboring pheromone
+    lookup, move selection (random walk or pheromone following), aging,
+    death and food pickup. Loaded ants are skipped.
+
+    The randomness is drawn in bulk before the call: choices holds one
+    uniform float per ant for the explore/follow decision and draws one
+    random 31-bit integer per ant for the direction pick.
+
+    Everything is done with scalar locals in a single pass over the arrays,
+    so no temporary array is allocated per tick. The loop is embarrassingly
+    parallel: ant i only reads its own random slots and writes its own
+    entries of age, path_row, path_col, cur_row, cur_col, directions and
+    is_loaded, and the shared pheromone map is read-only here (marking
+    happens serially in Colony.advance).
+
+    cur_row / cur_col mirror the position at the ant's (new) age so that
+    advance can mark pheromones without re-gathering the path history.
+    """
+    for i in prange(choices.shape[0]):
+        if is_loaded[i]:
+            continue
+        # Possible exits of the cell occupied by the ant:
+        row = path_row[i, age[i]]
+        col = path_col[i, age[i]]
+        cell = the_maze[row, col]
+        has_north_exit = (cell & NORTH) > 0
+        has_east_exit = (cell & EAST) > 0
+        has_south_exit = (cell & SOUTH) > 0
+        has_west_exit = (cell & WEST) > 0
+
+        # Reading neighboring pheromones (the pheromone map has ghost cells),
+        # visiting the 3x3 stencil row by row to stay cache-friendly:
+        north_pheromone = pheromon[row, col+1] if has_north_exit else 0.
+        west_pheromone = pheromon[row+1, col] if has_west_exit else 0.
+        east_pheromone = pheromon[row+1, col+2] if has_east_exit else 0.
+        south_pheromone = pheromon[row+2, col+1] if has_south_exit else 0.
+        max_pheromone = max(max(north_pheromone, east_pheromone),
+                            max(south_pheromone, west_pheromone))
+
+        if choices[i] <= exploration_coef or max_pheromone == 0.:
+            # The ant explores the maze by choice or because no pheromone can
+            # guide it: sample a direction directly among the legal moves.
+            exits_mask = 0
+            if has_north_exit:
+                exits_mask |= 1 << DIR_NORTH
+            if has_east_exit:
+                exits_mask |= 1 << DIR_EAST
+            if has_west_exit:
+                exits_mask |= 1 << DIR_WEST
+            if has_south_exit:
+                exits_mask |= 1 << DIR_SOUTH
+            # Refuse to go back where we came from, unless it is the only
+            # exit (for DIR_NONE this clears bit 4, which is a no-op)
+            if _POPCOUNT[exits_mask] > 1:
+                exits_mask &= ~(1 << (3 - directions[i]))
+            dir = _NTH_SET_BIT[exits_mask, draws[i] % _POPCOUNT[exits_mask]]
+            if dir == DIR_NORTH:
+                row -= 1
+            elif dir == DIR_EAST:
+                col += 1
+            elif dir == DIR_WEST:
+                col -= 1
+            else:
+                row += 1
+            path_row[i, age[i] + 1] = row
+            path_col[i, age[i] + 1] = col
+            directions[i] = dir
+        else:
+            # The ant follows the strongest pheromone around it. A tie picks
+            # the first maximum in North, East, South, West order; the old
+            # vectorized code moved along both tied axes at once, stepping
+            # diagonally through walls.
+            if north_pheromone == max_pheromone:
+                row -= 1
+            elif east_pheromone == max_pheromone:
+                col += 1
+            elif south_pheromone == max_pheromone:
+                row += 1
+            else:
+                col -= 1
+            path_row[i, age[i] + 1] = row
+            path_col[i, age[i] + 1] = col
+
+        # Aging one unit for the age of ants not carrying food
+        age[i] += 1
+
+        # Killing ants at the end of their life:
+        if age[i] == max_life[i]:
+            age[i] = 0
+            path_row[i, 0] = pos_nest[0]
+            path_col[i, 0] = pos_nest[1]
+            directions[i] = DIR_NONE
+            row = pos_nest[0]
+            col = pos_nest[1]
+        cur_row[i] = row
+        cur_col[i] = col
+
+        # For ants reaching food, we update their states:
+        if row == pos_food[0] and col == pos_food[1]:
+            is_loaded[i] = LOADED
+
+
+# Warm the JIT cache at import time with a dummy one-ant colony so that the
+# first real tick does not pay the compilation latency.
+_explore_kernel(np.ones(1, dtype=np.double), np.ones(1, dtype=np.int32),
+                np.zeros(1, dtype=np.int32),
+                np.zeros((1, 2), dtype=np.int16), np.zeros((1, 2), dtype=np.int16),
+                np.zeros(1, dtype=np.int16), np.zeros(1, dtype=np.int16),
+                np.full(1, DIR_NONE, dtype=np.int8), np.zeros(1, dtype=np.int8),
+                np.full(1, 2, dtype=np.int32),
+                np.full((1, 1), NORTH | EAST | SOUTH | WEST, dtype=np.int8),
+                np.zeros((3, 3), dtype=np.double), (2, 2), (0, 0), 0.)
+
+
+class Colony:
+    """
+    Represent an ant colony. Ants are not individualized for performance reasons!
+
+    Inputs :
+        nb_ants  : Number of ants in the anthill
+        pos_init : Initial positions of ants (anthill position)
+        max_life : Maximum life that ants can reach
+        seed     : Seed of the random stream (offset it by the MPI rank so
+                   every process draws a distinct stream)
+    """
+    def __init__(self, nb_ants, pos_init, max_life, seed=12345):
+        # Vectorized PCG64 generator replacing the per-ant MINSTD seeds
+        self._rng = np.random.default_rng(seed)
+        # State of each ant : loaded or unloaded
+        self.is_loaded = np.zeros(nb_ants, dtype=np.int8)
+        # Amount of life for each ant = 75% à 100% of maximal ants life
+        self.max_life = np.full(nb_ants, max_life, dtype=np.int32)
+        self.max_life -= np.int32(max_life*self._rng.random(nb_ants))//4
+        # Ages of ants : zero at beginning
+        self.age = np.zeros(nb_ants, dtype=np.int32)
+        # History of the path taken by each ant, stored column-wise (one array
+        # per coordinate) so each per-ant history is contiguous in memory.
+        # The position at the ant's age represents its current position.
+        self.path_row = np.zeros((nb_ants, max_life+1), dtype=np.int16)
+        self.path_col = np.zeros((nb_ants, max_life+1), dtype=np.int16)
+        self.path_row[:, 0] = pos_init[0]
+        self.path_col[:, 0] = pos_init[1]
+        # Current position of each ant (the path entry at its age), kept up
+        # to date by the kernel and return_to_nest so advance never has to
+        # re-gather it from the history
+        self.cur_row = np.full(nb_ants, pos_init[0], dtype=np.int16)
+        self.cur_col = np.full(nb_ants, pos_init[1], dtype=np.int16)
+        # Direction in which the ant is currently facing (depends on the direction it came from).
+        self.directions = np.full(nb_ants, d.DIR_NONE, dtype=np.int8)
+        
+        '''
+        self.sprites = []
+        img = pg.image.load("ants.png").convert_alpha()
+        for i in range(0, 32, 8):
+            self.sprites.append(pg.Surface.subsurface(img, i, 0, 8, 8))
+            '''
+
+
+    def return_to_nest(self, loaded_ants, pos_nest, food_counter):
+        """
+        Function that returns the ants carrying food to their nests.
+
+        Inputs :
+            loaded_ants: Indices of ants carrying food
+            pos_nest: Position of the nest where ants should go
+            food_counter: Current quantity of food in the nest
+
+        Returns the new quantity of food
+        """
+        self.age[loaded_ants] -= 1
+
+        rows = self.path_row[loaded_ants, self.age[loaded_ants]]
+        cols = self.path_col[loaded_ants, self.age[loaded_ants]]
+        self.cur_row[loaded_ants] = rows
+        self.cur_col[loaded_ants] = cols
+        in_nest_tmp = np.logical_and(rows == pos_nest[0], cols == pos_nest[1])
+        if in_nest_tmp.any():
+            in_nest_loc = np.nonzero(in_nest_tmp)[0]
+            if in_nest_loc.shape[0] > 0:
+                in_nest = loaded_ants[in_nest_loc]
+                self.is_loaded[in_nest] = UNLOADED
+                self.age[in_nest] = 0
+                food_counter += in_nest_loc.shape[0]
+        return food_counter
+
+    def explore(self, unloaded_ants, the_maze, pos_food, pos_nest, pheromones):
+        """
+        Management of unloaded ants exploring the maze.
+
+        Inputs:
+            unloadedAnts: Indices of ants that are not loaded
+            maze        : The maze in which ants move
+            posFood     : Position of food in the maze
+            posNest     : Position of the ants' nest in the maze
+            pheromones  : The pheromone map (which also has ghost cells for
+                          easier edge management)
+
+        Outputs: None
+
+        The whole update runs in the compiled kernel, which reads is_loaded
+        directly to skip loaded ants; the per-ant randomness is drawn here
+        in two bulk generator calls.
+        """
+        nb_ants = self.age.shape[0]
+        choices = self._rng.random(nb_ants)
+        draws = self._rng.integers(0, 2147483647, size=nb_ants, dtype=np.int32)
+        _explore_kernel(choices, draws, self.age, self.path_row, self.path_col,
+                        self.cur_row, self.cur_col,
+                        self.directions, self.is_loaded, self.max_life,
+                        the_maze.maze, pheromones.pheromon,
+                        pos_food, pos_nest, exploration_coefs)
+
+    def advance(self, the_maze, pos_food, pos_nest, pheromones, food_counter=0):
+        loaded_ants = np.nonzero(self.is_loaded == True)[0]
+        unloaded_ants = np.nonzero(self.is_loaded == False)[0]
+        if loaded_ants.shape[0] > 0:
+            food_counter = self.return_to_nest(loaded_ants, pos_nest, food_counter)
+        if unloaded_ants.shape[0] > 0:
+            self.explore(unloaded_ants, the_maze, pos_food, pos_nest, pheromones)
+
+        # The current positions are maintained by return_to_nest and the
+        # kernel, so no gather from the path history is needed here
+        has_north_exit = the_maze.has_north[self.cur_row, self.cur_col]
+        has_east_exit = the_maze.has_east[self.cur_row, self.cur_col]
+        has_south_exit = the_maze.has_south[self.cur_row, self.cur_col]
+        has_west_exit = the_maze.has_west[self.cur_row, self.cur_col]
+        # Marking pheromones (one vectorized update for the whole colony):
+        pheromones.mark_batch(self.cur_row, self.cur_col,
+                              np.stack([has_north_exit, has_east_exit, has_west_exit, has_south_exit], axis=1))
+        
+        return food_counter
+        
+        # Method to return specific attributes of the Ants class
+    def returns(self):
+        return self.directions, self.path_row, self.path_col, self.age
+
+# Class responsible for displaying ant sprites
+class Colony_show:
+    def __init__(self):
+        # pygame is only needed (and imported) on the display side
+        global pg
+        import pygame as pg
+        # Initialize a list to store ant sprites
+        self.sprites = []
+        # Load the ant sprites from the image file "ants.png"
+        img = pg.image.load("ants.png").convert_alpha()
+        # Extract individual sprites from the loaded image and store them in the list
+        for i in range(0, 32, 8):
+            self.sprites.append(pg.Surface.subsurface(img, i, 0, 8, 8))
+
+    # Method to display ant sprites on the screen
+    def display(self, screen, directions_recv, cur_row_recv, cur_col_recv):
+        # The workers send the current positions directly, so the sprite
+        # coordinates are two vectorized multiplies; the whole batch goes to
+        # the SDL layer in a single blits call
+        xs = 8*cur_col_recv
+        ys = 8*cur_row_recv
+        screen.blits([(self.sprites[directions_recv[i]], (xs[i], ys[i])) for i in range(directions_recv.shape[0])],
+                     doreturn=False)
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import pygame as pg
+    from mpi4py import MPI
+
+    comm = MPI.COMM_WORLD.Dup()
+    rank = comm.Get_rank()  # Get the rank of the current process
+    nbp = comm.Get_size()   # Get the total number of processes
+
+    # Share the cores between the MPI processes so that the Numba thread
+    # pools do not oversubscribe the machine.
+    set_num_threads(max(1, os.cpu_count() // nbp))
+
+    # Default maze size
+    size_laby = 25, 25
+
+    # Check for command line arguments to customize maze size
+    if len(sys.argv) > 2:
+        size_laby = int(sys.argv[1]), int(sys.argv[2])
+
+    # Calculate screen resolution based on maze size
+    resolution = size_laby[1] * 8, size_laby[0] * 8
+
+    # Initial positions and maximum life for ants
+    pos_food = size_laby[0] - 1, size_laby[1] - 1
+    pos_nest = 0, 0
+    max_life = 500
+
+    # Check if command line arguments specify maximum ant life (every process
+    # needs it to size the path buffers consistently)
+    if len(sys.argv) > 3:
+        max_life = int(sys.argv[3])
+
+    # Calculate the number of ants for each process (excluding process 0)
+    nb_ants = size_laby[0] * size_laby[1] // 4
+    nb_ants = round(nb_ants / (nbp - 1))
+
+    # Shared-memory window holding one pheromone grid per process: each
+    # worker writes its own grid in place and process 0 merges them into its
+    # own segment, so the grids never travel through messages. This assumes
+    # all processes are colocated on one node.
+    comm_shared = comm.Split_type(MPI.COMM_TYPE_SHARED)
+    assert comm_shared.Get_size() == nbp, "the shared pheromone window needs all processes on one node"
+    grid_shape = size_laby[0] + 2, size_laby[1] + 2
+    _itemsize = MPI.DOUBLE.Get_size()
+    win_pherom = MPI.Win.Allocate_shared(grid_shape[0] * grid_shape[1] * _itemsize,
+                                         _itemsize, comm=comm_shared)
+    pherom_shared = []
+    for r in range(nbp):
+        _buf, _ = win_pherom.Shared_query(r)
+        pherom_shared.append(np.ndarray(buffer=_buf, dtype=np.double, shape=grid_shape))
+
+    # Process with rank 0
+    if rank == 0:
+        # Initialize pygame and set screen resolution
+        pg.init()
+        screen = pg.display.set_mode(resolution)
+
+        # Receive maze data from process rank 1
+        maze_recv = comm.recv(source=1, tag=8)
+        a_maze_show = maze.Maze_show(maze_recv)
+        mazeImg = a_maze_show.display()
+        snapshop_taken = False
+
+        # Initialize Colony_show object for displaying ants
+        ants_show = Colony_show()
+        # The pheromone data is read straight from the shared window
+        pherom_show = pheromone.Pheromon_show(pherom_shared[0])
+        # Running sum of the per-tick FPS: the average is computed in O(1)
+        # instead of summing an ever-growing list every frame
+        fps_sum = 0.
+        counter = 0
+
+        # Preallocated buffers for the per-tick raw-buffer exchanges; only
+        # the current positions travel, not the whole path history
+        directions_recv_list = [np.empty(nb_ants, dtype=np.int8) for _ in range(nbp - 1)]
+        cur_row_recv_list = [np.empty(nb_ants, dtype=np.int16) for _ in range(nbp - 1)]
+        cur_col_recv_list = [np.empty(nb_ants, dtype=np.int16) for _ in range(nbp - 1)]
+        food_counter_recv = np.zeros(1, dtype=np.int64)
+
+    # Processes with rank greater than 0
+    if rank > 0:
+        # Initialize food counter
+        food_counter = 0
+
+        # Create a maze with a specific seed for reproducibility
+        a_maze = maze.Maze(size_laby, 98726)
+
+        # Send maze data to process rank 0
+        maze_send = a_maze.retorno()
+        if rank == 1:
+            comm.send(maze_send, dest=0, tag=8)
+
+        # Set default alpha and beta values for pheromone calculation
+        alpha = 0.9
+        beta = 0.99
+
+        # Check for command line arguments specifying alpha and beta
+        if len(sys.argv) > 4:
+            alpha = float(sys.argv[4])
+        if len(sys.argv) > 5:
+            beta = float(sys.argv[5])
+
+        # Initialize Pheromon object for managing pheromones and move its
+        # grid into this process's segment of the shared window
+        pherom = pheromone.Pheromon(size_laby, pos_food, alpha, beta)
+        np.copyto(pherom_shared[rank], pherom.pheromon)
+        pherom.pheromon = pherom_shared[rank]
+
+        # Initialize ant colony for each process
+        ants = Colony(nb_ants, pos_nest, max_life, seed=12345 + rank)
+        unloaded_ants = np.array(range(nb_ants))
+
+        # One-element buffer used to exchange the food counter by raw buffer
+        food_counter_send = np.zeros(1, dtype=np.int64)
+
+    while True:
+        # If the process rank is greater than 0
+        if rank > 0:
+            # Advance ants in the maze and update food counter
+            food_counter = ants.advance(a_maze, pos_food, pos_nest, pherom, food_counter)
+
+            # Start the sends of this tick's ant state to process 0 without
+            # blocking; the pheromone grid is already visible to process 0
+            # through the shared window
+            food_counter_send[0] = food_counter
+            pending_sends = [comm.Isend([ants.directions, MPI.INT8_T], dest=0, tag=1),
+                             comm.Isend([ants.cur_row, MPI.INT16_T], dest=0, tag=2),
+                             comm.Isend([ants.cur_col, MPI.INT16_T], dest=0, tag=5),
+                             comm.Isend([food_counter_send, MPI.INT64_T], dest=0, tag=6)]
+
+            # First barrier: every worker grid of this tick is complete and
+            # process 0 may read them. Second barrier: the merge is done and the
+            # grids may be modified again.
+            comm.Barrier()
+            comm.Barrier()
+
+            # Adopt the merged grid and perform pheromone evaporation around the
+            # food source
+            np.copyto(pherom.pheromon, pherom_shared[0])
+            pherom.do_evaporation(pos_food)
+
+            # Receive the global food counter from process 0. It only answers
+            # once it has received everything, so the pending sends are complete
+            # before their buffers are reused.
+            MPI.Request.Waitall(pending_sends)
+            comm.Recv([food_counter_send, MPI.INT64_T], source=0, tag=9)
+            food_counter = int(food_counter_send[0])
+
+        # If the process rank is 0
+        if rank == 0:
+            # Check for pygame events
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    pg.quit()
+                    exit(0)
+
+            # Record current time
+            deb = time.time()
+            food_counter_total = 0
+
+            # Receive ant updates and food counter from each process (excluding
+            # process 0) into the preallocated buffers
+            for i in range(1, nbp):
+                comm.Recv([directions_recv_list[i-1], MPI.INT8_T], source=i, tag=1)
+                comm.Recv([cur_row_recv_list[i-1], MPI.INT16_T], source=i, tag=2)
+                comm.Recv([cur_col_recv_list[i-1], MPI.INT16_T], source=i, tag=5)
+                comm.Recv([food_counter_recv, MPI.INT64_T], source=i, tag=6)
+                food_counter = int(food_counter_recv[0])
+                food_counter_total = food_counter + food_counter_total
+                directions_recv = directions_recv_list[i-1]
+                cur_row_recv = cur_row_recv_list[i-1]
+                cur_col_recv = cur_col_recv_list[i-1]
+
+            # Merge the worker grids (cell-wise maximum) into this process's
+            # shared segment between the two barriers, while the workers keep
+            # their hands off their grids
+            comm.Barrier()
+            pheromon = pherom_shared[0]
+            np.copyto(pheromon, pherom_shared[1])
+            for i in range(2, nbp):
+                np.maximum(pheromon, pherom_shared[i], out=pheromon)
+            comm.Barrier()
+
+            # Send back the food counter to each process (excluding process 0);
+            # the merged grid is read directly from the shared segment
+            for i in range(1, nbp):
+                comm.Send([food_counter_recv, MPI.INT64_T], dest=i, tag=9)
+
+            # Display pheromone and ant data on the screen
+            pherom_show.display(screen, pheromon)
+            screen.blit(mazeImg, (0, 0))
+            ants_show.display(screen, directions_recv, cur_row_recv, cur_col_recv)
+
+            # Update the display
+            pg.display.update()
+
+            # Record end time and save snapshot if food_counter is 1 and snapshot has not been taken
+            end = time.time()
+            if food_counter == 1 and not snapshop_taken:
+                pg.image.save(screen, "MyFirstFood.png")
+                snapshop_taken = True
+
+            # Calculate FPS and print statistics
+            fps_sum += 1./(end-deb)
+            counter += 1
+            print(f"FPS : {1./(end-deb):6.2f}, nourriture : {food_counter:7d}, averege fps: {fps_sum/counter}", end='\r')
@@ -3,7 +3,6 @@ Creates a two-dimensional maze where each cell in the maze is defined by the sum
 (North = 1, East = 2, South = 4, West = 8), with each cell corresponding to a value stored in a two-dimensional array.
 """
 import numpy as np
-import pygame as pg
 
 NORTH = 1
 EAST  = 2
@@ -61,6 +60,14 @@ class Maze:
             else:
                 historic.pop()
 
+        # The maze is immutable once built: precompute the exits as four
+        # boolean arrays so that per-tick lookups are a single gather
+        # instead of a bitwise test on the packed cells
+        self.has_north = (self.maze & NORTH) > 0
+        self.has_east = (self.maze & EAST) > 0
+        self.has_south = (self.maze & SOUTH) > 0
+        self.has_west = (self.maze & WEST) > 0
+
     def retorno(self):
         return self.maze
 
@@ -70,6 +77,10 @@ class Maze_show:
 
     def __init__(self,maze):
 
+        # pygame is only needed (and imported) on the display side
+        global pg
+        import pygame as pg
+
         self.cases_img = []
         self.maze  = maze
 
@@ -92,6 +103,7 @@ class Maze_show:
 
 if __name__  == "__main__":
     import time
+    import pygame as pg
     dimensions = (50, 80)
     pg.init()
     resolution = dimensions[1]*8, dimensions[0]*8
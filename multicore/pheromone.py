@@ -2,7 +2,6 @@
 """
 import numpy as np
 import direction as d
-import pygame as pg
 
 
 class Pheromon:
@@ -20,10 +19,10 @@ class Pheromon:
         
 
     def do_evaporation(self, the_pos_food):
-        #print("antessssssssssssssssssss",self.pheromon)
-        self.pheromon = self.beta * self.pheromon
+        # In place: one bandwidth-bound pass over the grid, no reallocation,
+        # and the buffer identity is preserved for the MPI exchanges
+        self.pheromon *= self.beta
         self.pheromon[the_pos_food[0]+1, the_pos_food[1]+1] = 1.
-        #print("depoisssssssssssssssssss",self.pheromon)
 
     def mark(self, the_position, has_WESN_exits):
         assert(the_position[0] >= 0)
@@ -36,6 +35,22 @@ class Pheromon:
         self.pheromon[the_position[0]+1, the_position[1]+1] = self.alpha*np.max(pheromones) + (1-self.alpha)*0.25*pheromones.sum()
         
         #print("eeeeeeeeeeeeeeeeeeeeeeee",self.pheromon)
+
+    def mark_batch(self, rows, cols, has_WESN_exits):
+        """
+        Vectorized version of mark for a whole batch of ants: rows and cols
+        are the (n,) cell coordinates and has_WESN_exits an (n, 4) boolean
+        array whose columns are indexed by the direction constants. All
+        cells are updated from the pheromone state at the start of the
+        call, in a single pass.
+        """
+        cells = np.stack([np.where(has_WESN_exits[:, d.DIR_WEST], self.pheromon[rows+1, cols], 0.),
+                          np.where(has_WESN_exits[:, d.DIR_EAST], self.pheromon[rows+1, cols+2], 0.),
+                          np.where(has_WESN_exits[:, d.DIR_SOUTH], self.pheromon[rows+2, cols+1], 0.),
+                          np.where(has_WESN_exits[:, d.DIR_NORTH], self.pheromon[rows, cols+1], 0.)])
+        pheromones = np.maximum(cells, 0.)
+        self.pheromon[rows+1, cols+1] = self.alpha*pheromones.max(axis=0) + (1-self.alpha)*0.25*pheromones.sum(axis=0)
+
     def return_pheromon(self):
         return self.pheromon
 